@@ -1,8 +1,12 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+from dataclasses import dataclass
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, NamedTuple, Optional
 import io
-from docx import Document
+import pickle
 
 # =========================================================
 # 1. PATHS
@@ -15,22 +19,61 @@ GLOBAL_PATH = Path("data/global_settings.csv")
 # Replace your old broken PDLLA CSV with the clean one and keep this filename the same.
 PDLLA_TIERS_PATH = Path("data/Biogenomics Pricing - PDLLA.csv")
 
+# Pickled config built from the CSVs above; rebuilt whenever any of them changes
+CONFIG_CACHE_PATH = Path("data/.cache/config.pkl")
+
+# Per-tier fields, in the order they appear in the tier dicts
+TIER_COLUMNS = [
+    "description",
+    "case_price",
+    "cost_per_tx",
+    "savings_vs_standard_pct",
+    "tx_per_case",
+    "default_clinic_price_per_tx",
+    "default_extra_cost_per_tx",
+    "default_min_cases",
+    "default_max_cases",
+]
+TIER_FLOAT_COLUMNS = [
+    "case_price",
+    "cost_per_tx",
+    "savings_vs_standard_pct",
+    "default_clinic_price_per_tx",
+    "default_extra_cost_per_tx",
+]
+TIER_INT_COLUMNS = ["tx_per_case", "default_min_cases", "default_max_cases"]
+
+# Common header aliases for the tier CSVs (just in case headers vary)
+TIER_ALIASES = {
+    "tier": "tier_name",
+    "tiername": "tier_name",
+    "name": "tier_name",
+    "product_tier": "tier_name",
+    "desc": "description",
+    "tier_description": "description",
+    "details": "description",
+    "price_per_case": "case_price",
+    "caseprice": "case_price",
+    "cost_per_treatment": "cost_per_tx",
+    "treatments_per_case": "tx_per_case",
+}
+
 
 # =========================================================
 # 2. CSV LOADING + VALIDATION (ROBUST)
 # =========================================================
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    # Only relabels columns; callers pass freshly read frames, so no copy is needed
     df.columns = df.columns.astype(str).str.strip().str.lower()
     return df
 
 
 def _rename_aliases(df: pd.DataFrame, alias_map: dict) -> pd.DataFrame:
-    df = df.copy()
+    renames = {}
     for old, new in alias_map.items():
-        if old in df.columns and new not in df.columns:
-            df.rename(columns={old: new}, inplace=True)
-    return df
+        if old in df.columns and new not in df.columns and new not in renames.values():
+            renames[old] = new
+    return df.rename(columns=renames) if renames else df
 
 
 def _require_columns(df: pd.DataFrame, required: list[str], df_name: str) -> None:
@@ -41,37 +84,37 @@ def _require_columns(df: pd.DataFrame, required: list[str], df_name: str) -> Non
         st.stop()
 
 
-def _safe_int(x, default=0):
-    try:
-        return int(float(x))
-    except Exception:
-        return default
+def _coerce_tier_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    # Integer columns stay nullable here; blanks are filled with defaults in _tiers_to_dict
+    df = df.astype(dict.fromkeys(TIER_FLOAT_COLUMNS, "float64"))
+    # Blank cells become "nan" like the old str(row[...]); astype(str) alone keeps NaN on pandas 3.x
+    df[["tier_name", "description"]] = df[["tier_name", "description"]].fillna("nan").astype(str)
+    df[TIER_INT_COLUMNS] = df[TIER_INT_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    return df
+
+
+def _tiers_to_dict(df: pd.DataFrame, int_defaults: dict) -> dict:
+    df = df.fillna(int_defaults).astype(dict.fromkeys(TIER_INT_COLUMNS, "int64"))
+    # A repeated tier keeps its first position but takes its last row's values, like plain dict assignment
+    first_order = df["tier_name"].drop_duplicates()
+    df = df.drop_duplicates("tier_name", keep="last").set_index("tier_name").reindex(first_order)
+    return df[TIER_COLUMNS].to_dict(orient="index")
+
+
+def _load_tiers_csv(path: Path) -> pd.DataFrame:
+    # Shared ingest for tiers.csv and the PDLLA pricing CSV
+    df = _rename_aliases(_normalize_columns(pd.read_csv(path)), TIER_ALIASES)
+    _require_columns(df, ["tier_name", *TIER_COLUMNS], path.name)
+    return _coerce_tier_dtypes(df)
 
 
 @st.cache_data
 def load_config():
-    tiers_df = _normalize_columns(pd.read_csv(TIERS_PATH))
-    pdlla_df = _normalize_columns(pd.read_csv(PDLLA_TIERS_PATH))
+    tiers_df = _load_tiers_csv(TIERS_PATH)
+    pdlla_df = _load_tiers_csv(PDLLA_TIERS_PATH)
     shipping_df = _normalize_columns(pd.read_csv(SHIPPING_PATH))
     global_df = _normalize_columns(pd.read_csv(GLOBAL_PATH))
 
-    # Rename common aliases (just in case headers vary)
-    alias_map_common = {
-        "tier": "tier_name",
-        "tiername": "tier_name",
-        "name": "tier_name",
-        "product_tier": "tier_name",
-        "desc": "description",
-        "tier_description": "description",
-        "details": "description",
-        "price_per_case": "case_price",
-        "caseprice": "case_price",
-        "cost_per_treatment": "cost_per_tx",
-        "treatments_per_case": "tx_per_case",
-    }
-    tiers_df = _rename_aliases(tiers_df, alias_map_common)
-    pdlla_df = _rename_aliases(pdlla_df, alias_map_common)
-
     shipping_df = _rename_aliases(
         shipping_df,
         {
@@ -91,132 +134,205 @@ def load_config():
         },
     )
 
-    tier_required = [
-        "tier_name",
-        "description",
-        "case_price",
-        "cost_per_tx",
-        "savings_vs_standard_pct",
-        "tx_per_case",
-        "default_clinic_price_per_tx",
-        "default_extra_cost_per_tx",
-        "default_min_cases",
-        "default_max_cases",
-    ]
-    _require_columns(tiers_df, tier_required, "tiers.csv")
-    _require_columns(pdlla_df, tier_required, "Biogenomics Pricing - PDLLA.csv")
     _require_columns(shipping_df, ["shipping_name", "shipping_cost"], "shipping.csv")
     _require_columns(global_df, ["key", "value"], "global_settings.csv")
 
-    return tiers_df, pdlla_df, shipping_df, global_df
-
+    shipping_df = shipping_df.astype({"shipping_cost": "float64"})
+    shipping_df["shipping_name"] = shipping_df["shipping_name"].fillna("nan").astype(str)
 
-tiers_df, pdlla_df, shipping_df, global_df = load_config()
+    return tiers_df, pdlla_df, shipping_df, global_df
 
-# =========================================================
-# 3. GLOBAL SETTINGS
-# =========================================================
-GLOBAL_SETTINGS = {row["key"]: row["value"] for _, row in global_df.iterrows()}
-CURRENCY = str(GLOBAL_SETTINGS.get("currency_symbol", "$"))
-DEFAULT_MIN_CASES_GLOBAL = _safe_int(GLOBAL_SETTINGS.get("default_min_cases_global", 1), 1)
-DEFAULT_MAX_CASES_GLOBAL = _safe_int(GLOBAL_SETTINGS.get("default_max_cases_global", 500), 500)
 
 # =========================================================
-# 4. BUILD TIER DICTS
+# 3. BUILD CONFIG (GLOBAL SETTINGS + TIER DICTS)
 # =========================================================
-TIERS_BASE = {}
-for _, row in tiers_df.iterrows():
-    TIERS_BASE[str(row["tier_name"])] = {
-        "description": str(row.get("description", "")),
-        "case_price": float(row["case_price"]),
-        "cost_per_tx": float(row["cost_per_tx"]),
-        "savings_vs_standard_pct": float(row["savings_vs_standard_pct"]),
-        "tx_per_case": _safe_int(row["tx_per_case"], 1),
-        "default_clinic_price_per_tx": float(row["default_clinic_price_per_tx"]),
-        "default_extra_cost_per_tx": float(row["default_extra_cost_per_tx"]),
-        "default_min_cases": _safe_int(row["default_min_cases"], DEFAULT_MIN_CASES_GLOBAL),
-        "default_max_cases": _safe_int(row["default_max_cases"], DEFAULT_MAX_CASES_GLOBAL),
+@dataclass(frozen=True, slots=True)
+class GlobalSettings:
+    currency: str
+    min_cases: int
+    max_cases: int
+
+
+def _build_config_data() -> dict:
+    tiers_df, pdlla_df, shipping_df, global_df = load_config()
+
+    # Split settings once into numeric values and plain-text values
+    numeric_values = pd.to_numeric(global_df["value"], errors="coerce")
+    is_numeric = numeric_values.notna()
+    numeric_settings = dict(zip(global_df.loc[is_numeric, "key"], numeric_values[is_numeric]))
+    # Blank text values become "nan" like the old str(...); astype(str) alone keeps NaN on pandas 3.x
+    text_values = global_df.loc[~is_numeric, "value"].fillna("nan").astype(str)
+    text_settings = dict(zip(global_df.loc[~is_numeric, "key"], text_values))
+    settings = {
+        "currency": text_settings.get("currency_symbol", "$"),
+        "min_cases": int(numeric_settings.get("default_min_cases_global", 1)),
+        "max_cases": int(numeric_settings.get("default_max_cases_global", 500)),
     }
 
-if not TIERS_BASE:
-    st.error("No tiers found in tiers.csv")
-    st.stop()
-
-TX_PER_CASE_DEFAULT = list(TIERS_BASE.values())[0]["tx_per_case"]
-
-PDLLA_TIERS_BASE = {}
-for _, row in pdlla_df.iterrows():
-    PDLLA_TIERS_BASE[str(row["tier_name"])] = {
-        "description": str(row.get("description", "")),
-        "case_price": float(row["case_price"]),
-        "cost_per_tx": float(row["cost_per_tx"]),
-        "savings_vs_standard_pct": float(row["savings_vs_standard_pct"]),
-        "tx_per_case": _safe_int(row["tx_per_case"], TX_PER_CASE_DEFAULT),
-        "default_clinic_price_per_tx": float(row["default_clinic_price_per_tx"]),
-        "default_extra_cost_per_tx": float(row["default_extra_cost_per_tx"]),
-        "default_min_cases": _safe_int(row["default_min_cases"], DEFAULT_MIN_CASES_GLOBAL),
-        "default_max_cases": _safe_int(row["default_max_cases"], DEFAULT_MAX_CASES_GLOBAL),
+    case_defaults = {"default_min_cases": settings["min_cases"], "default_max_cases": settings["max_cases"]}
+    tiers = _tiers_to_dict(tiers_df, {"tx_per_case": 1, **case_defaults})
+    if not tiers:
+        st.error("No tiers found in tiers.csv")
+        st.stop()
+
+    tx_per_case_default = next(iter(tiers.values()))["tx_per_case"]
+    pdlla_tiers = _tiers_to_dict(pdlla_df, {"tx_per_case": tx_per_case_default, **case_defaults})
+
+    return {
+        "settings": settings,
+        "tiers": tiers,
+        "pdlla_tiers": pdlla_tiers,
+        "shipping": dict(zip(shipping_df["shipping_name"], shipping_df["shipping_cost"])),
     }
 
-SHIPPING_BASE = {
-    str(row["shipping_name"]): float(row["shipping_cost"])
-    for _, row in shipping_df.iterrows()
-}
+
+def _load_or_build_cache() -> dict:
+    # The pickle only holds plain dicts, and is trusted only while newer than every CSV and this script
+    sources = [TIERS_PATH, PDLLA_TIERS_PATH, SHIPPING_PATH, GLOBAL_PATH, Path(__file__)]
+    newest_source = max(p.stat().st_mtime for p in sources)
+
+    if CONFIG_CACHE_PATH.exists() and CONFIG_CACHE_PATH.stat().st_mtime > newest_source:
+        try:
+            with CONFIG_CACHE_PATH.open("rb") as f:
+                return pickle.load(f)
+        except Exception:
+            pass  # unreadable or stale format: rebuild below
+
+    data = _build_config_data()
+    try:
+        CONFIG_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = CONFIG_CACHE_PATH.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(CONFIG_CACHE_PATH)
+    except OSError:
+        pass  # read-only deployments simply skip the disk cache
+    return data
+
+
+@st.cache_resource
+def build_config():
+    data = _load_or_build_cache()
+    return SimpleNamespace(
+        settings=GlobalSettings(**data["settings"]),
+        tiers=data["tiers"],
+        tier_names=list(data["tiers"]),
+        pdlla_tiers=data["pdlla_tiers"],
+        shipping=data["shipping"],
+    )
+
+
+CFG = build_config()
 
 
 # =========================================================
-# 5. HELPERS
+# 4. HELPERS
 # =========================================================
-def calc_roi(tier, num_cases, price_per_tx, extra_cost_per_tx, shipping_cost):
-    case_price = float(tier["case_price"])
-    cost_per_tx_product = float(tier["cost_per_tx"])
-    tx_per_case = int(tier.get("tx_per_case", TX_PER_CASE_DEFAULT))
-
-    total_cases = int(num_cases)
-    total_txs = total_cases * tx_per_case
+class RoiResult(NamedTuple):
+    total_cases: int
+    total_txs: int
+    product_cost: float
+    shipping_cost: float
+    total_cost: float
+    revenue_per_tx: float
+    cost_per_tx_product: float
+    extra_cost_per_tx: float
+    total_cost_per_tx: float
+    profit_per_tx: float
+    total_revenue: float
+    total_profit: float
+    margin_pct: float
+    roi_pct: float
+    breakeven_txs: Optional[float]
+
+
+class RoiCore(NamedTuple):
+    total_txs: Any
+    product_cost: Any
+    total_cost: Any
+    total_cost_per_tx: Any
+    profit_per_tx: Any
+    total_revenue: Any
+    total_profit: Any
+
+
+def _roi_core(case_price, cost_per_tx, tx_per_case, num_cases, price_per_tx, extra_cost_per_tx, shipping_cost):
+    # Plain arithmetic only, so the same code serves scalars (calc_roi) and per-tier NumPy arrays
+    # (tier comparison); callers apply the zero-division guards their input type needs
+    total_txs = num_cases * tx_per_case
+    product_cost = num_cases * case_price
+    total_cost = product_cost + shipping_cost
+    total_cost_per_tx = cost_per_tx + extra_cost_per_tx
+    profit_per_tx = price_per_tx - total_cost_per_tx
+    return RoiCore(
+        total_txs=total_txs,
+        product_cost=product_cost,
+        total_cost=total_cost,
+        total_cost_per_tx=total_cost_per_tx,
+        profit_per_tx=profit_per_tx,
+        total_revenue=price_per_tx * total_txs,
+        total_profit=profit_per_tx * total_txs,
+    )
 
-    product_cost = total_cases * case_price
-    total_cost = product_cost + float(shipping_cost)
 
-    total_cost_per_tx = cost_per_tx_product + float(extra_cost_per_tx)
-    revenue_per_tx = float(price_per_tx)
-    profit_per_tx = revenue_per_tx - total_cost_per_tx
+def calc_roi(case_price, cost_per_tx, tx_per_case, num_cases, price_per_tx, extra_cost_per_tx, shipping_cost):
+    total_cases = int(num_cases)
+    core = _roi_core(
+        case_price=float(case_price),
+        cost_per_tx=float(cost_per_tx),
+        tx_per_case=int(tx_per_case),
+        num_cases=total_cases,
+        price_per_tx=float(price_per_tx),
+        extra_cost_per_tx=float(extra_cost_per_tx),
+        shipping_cost=float(shipping_cost),
+    )
 
-    total_revenue = revenue_per_tx * total_txs
-    total_profit = profit_per_tx * total_txs
+    margin_pct = (core.total_profit / core.total_revenue * 100) if core.total_revenue else 0
+    roi_pct = (core.total_profit / core.total_cost * 100) if core.total_cost else 0
+
+    breakeven_txs = core.total_cost / core.profit_per_tx if core.profit_per_tx > 0 else None
+
+    return RoiResult(
+        total_cases=total_cases,
+        total_txs=core.total_txs,
+        product_cost=core.product_cost,
+        shipping_cost=float(shipping_cost),
+        total_cost=core.total_cost,
+        revenue_per_tx=float(price_per_tx),
+        cost_per_tx_product=float(cost_per_tx),
+        extra_cost_per_tx=float(extra_cost_per_tx),
+        total_cost_per_tx=core.total_cost_per_tx,
+        profit_per_tx=core.profit_per_tx,
+        total_revenue=core.total_revenue,
+        total_profit=core.total_profit,
+        margin_pct=margin_pct,
+        roi_pct=roi_pct,
+        breakeven_txs=breakeven_txs,
+    )
 
-    margin_pct = (total_profit / total_revenue * 100) if total_revenue else 0
-    roi_pct = (total_profit / total_cost * 100) if total_cost else 0
 
-    breakeven_txs = total_cost / profit_per_tx if profit_per_tx > 0 else None
+def fc(x, _c=CFG.settings.currency):
+    return f"{_c}{x:,.0f}"
 
-    return {
-        "total_cases": total_cases,
-        "total_txs": total_txs,
-        "product_cost": product_cost,
-        "shipping_cost": float(shipping_cost),
-        "total_cost": total_cost,
-        "revenue_per_tx": revenue_per_tx,
-        "cost_per_tx_product": cost_per_tx_product,
-        "extra_cost_per_tx": float(extra_cost_per_tx),
-        "total_cost_per_tx": total_cost_per_tx,
-        "profit_per_tx": profit_per_tx,
-        "total_revenue": total_revenue,
-        "total_profit": total_profit,
-        "margin_pct": margin_pct,
-        "roi_pct": roi_pct,
-        "breakeven_txs": breakeven_txs,
-    }
 
+def fc1(x, _c=CFG.settings.currency):
+    return f"{_c}{x:,.1f}"
 
-def fc(x):
-    return f"{CURRENCY}{x:,.0f}"
 
+def _add_table(doc, header, rows):
+    # Fill cells straight from the <w:tr>/<w:tc> elements: python-docx's row.cells re-walks the
+    # table grid on every access, which makes filling a table row by row quadratic
+    from docx.table import _Cell
 
-def fc1(x):
-    return f"{CURRENCY}{x:,.1f}"
+    table = doc.add_table(rows=len(rows) + 1, cols=len(header))
+    for tr, values in zip(table._tbl.tr_lst, [header, *rows]):
+        for tc, text in zip(tr.tc_lst, values):
+            _Cell(tc, table).text = text
+    return table
 
 
+# Returns raw bytes so the cached value pickles cheaply and can go straight to st.download_button
+@st.cache_data(max_entries=32, show_spinner=False)
 def build_word_report(
     genovia_tier_name,
     genovia_results,
@@ -229,6 +345,8 @@ def build_word_report(
     shipping_cost,
     genovia_comp_df,
 ):
+    from docx import Document
+
     doc = Document()
 
     doc.add_heading("Genovia vs PDLLA ROI Report", level=1)
@@ -246,64 +364,49 @@ def build_word_report(
     doc.add_paragraph(f"PDLLA tier: {pdlla_tier_name}")
 
     doc.add_heading("2. Genovia Financial Metrics", level=2)
-    table = doc.add_table(rows=1, cols=2)
-    table.rows[0].cells[0].text = "Metric"
-    table.rows[0].cells[1].text = "Value"
     metrics = [
-        ("Total treatments", f"{genovia_results['total_txs']:,}"),
-        ("Total revenue", fc(genovia_results["total_revenue"])),
-        ("Total cost (product + shipping)", fc(genovia_results["total_cost"])),
-        ("Total profit", fc(genovia_results["total_profit"])),
-        ("Profit per treatment", fc1(genovia_results["profit_per_tx"])),
-        ("Profit margin", f"{genovia_results['margin_pct']:.1f}%"),
-        ("ROI on order", f"{genovia_results['roi_pct']:.1f}%"),
+        ("Total treatments", f"{genovia_results.total_txs:,}"),
+        ("Total revenue", fc(genovia_results.total_revenue)),
+        ("Total cost (product + shipping)", fc(genovia_results.total_cost)),
+        ("Total profit", fc(genovia_results.total_profit)),
+        ("Profit per treatment", fc1(genovia_results.profit_per_tx)),
+        ("Profit margin", f"{genovia_results.margin_pct:.1f}%"),
+        ("ROI on order", f"{genovia_results.roi_pct:.1f}%"),
     ]
-    for name, value in metrics:
-        row = table.add_row().cells
-        row[0].text = name
-        row[1].text = value
+    _add_table(doc, ("Metric", "Value"), metrics)
 
     doc.add_heading("3. PDLLA Financial Metrics", level=2)
-    table2 = doc.add_table(rows=1, cols=2)
-    table2.rows[0].cells[0].text = "Metric"
-    table2.rows[0].cells[1].text = "Value"
     metrics_other = [
-        ("Total treatments", f"{pdlla_results['total_txs']:,}"),
-        ("Total revenue", fc(pdlla_results["total_revenue"])),
-        ("Total cost (product + shipping)", fc(pdlla_results["total_cost"])),
-        ("Total profit", fc(pdlla_results["total_profit"])),
-        ("Profit per treatment", fc1(pdlla_results["profit_per_tx"])),
-        ("Profit margin", f"{pdlla_results['margin_pct']:.1f}%"),
-        ("ROI on order", f"{pdlla_results['roi_pct']:.1f}%"),
+        ("Total treatments", f"{pdlla_results.total_txs:,}"),
+        ("Total revenue", fc(pdlla_results.total_revenue)),
+        ("Total cost (product + shipping)", fc(pdlla_results.total_cost)),
+        ("Total profit", fc(pdlla_results.total_profit)),
+        ("Profit per treatment", fc1(pdlla_results.profit_per_tx)),
+        ("Profit margin", f"{pdlla_results.margin_pct:.1f}%"),
+        ("ROI on order", f"{pdlla_results.roi_pct:.1f}%"),
     ]
-    for name, value in metrics_other:
-        row = table2.add_row().cells
-        row[0].text = name
-        row[1].text = value
+    _add_table(doc, ("Metric", "Value"), metrics_other)
 
     doc.add_heading("4. Genovia vs PDLLA – Direct Comparison", level=2)
-    delta_profit = genovia_results["total_profit"] - pdlla_results["total_profit"]
-    delta_roi = genovia_results["roi_pct"] - pdlla_results["roi_pct"]
+    delta_profit = genovia_results.total_profit - pdlla_results.total_profit
+    delta_roi = genovia_results.roi_pct - pdlla_results.roi_pct
     doc.add_paragraph(
-        f"Under the same clinic assumptions, Genovia generates {fc(genovia_results['total_profit'])} in total profit "
-        f"versus {fc(pdlla_results['total_profit'])} for PDLLA."
+        f"Under the same clinic assumptions, Genovia generates {fc(genovia_results.total_profit)} in total profit "
+        f"versus {fc(pdlla_results.total_profit)} for PDLLA."
     )
     doc.add_paragraph(f"Profit difference (Genovia − PDLLA): {fc(delta_profit)}.")
     doc.add_paragraph(f"ROI difference (Genovia − PDLLA): {delta_roi:.1f} percentage points.")
 
     doc.add_heading("5. Genovia Tier Comparison at Same Clinic Price", level=2)
-    comp_table = doc.add_table(rows=1, cols=4)
-    comp_table.rows[0].cells[0].text = "Tier"
-    comp_table.rows[0].cells[1].text = "Cost per Treatment (Genovia)"
-    comp_table.rows[0].cells[2].text = "Total Profit"
-    comp_table.rows[0].cells[3].text = "ROI %"
-
-    for _, row in genovia_comp_df.iterrows():
-        r = comp_table.add_row().cells
-        r[0].text = str(row["Tier"])
-        r[1].text = fc1(row["Cost per treatment"])
-        r[2].text = fc(row["Total Profit"])
-        r[3].text = f"{row['ROI %']:.1f}%"
+    comp_rows = genovia_comp_df.rename(columns={"Cost per treatment": "cost", "Total Profit": "profit", "ROI %": "roi"})
+    _add_table(
+        doc,
+        ("Tier", "Cost per Treatment (Genovia)", "Total Profit", "ROI %"),
+        [
+            (str(row.Tier), fc1(row.cost), fc(row.profit), f"{row.roi:.1f}%")
+            for row in comp_rows.itertuples(index=False)
+        ],
+    )
 
     doc.add_heading("6. Recommendations", level=2)
     recs = [
@@ -316,12 +419,17 @@ def build_word_report(
 
     buffer = io.BytesIO()
     doc.save(buffer)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
+
+
+# Cached so reruns that don't change the scenario skip building the one-row frame
+@st.cache_data(max_entries=64, show_spinner=False)
+def _scenario_csv_bytes(scenario_items: tuple) -> bytes:
+    return pd.DataFrame([dict(scenario_items)]).to_csv(index=False).encode()
 
 
 # =========================================================
-# 6. UI
+# 5. UI
 # =========================================================
 st.set_page_config(page_title="Genovia ROI Calculator", page_icon="💧", layout="centered")
 
@@ -329,85 +437,103 @@ st.title("Genovia™ ROI Calculator")
 st.caption("Compare Genovia exosome tiers and PDLLA tiers under the same clinic assumptions.")
 
 with st.sidebar:
-    st.markdown("### Tier Settings & Pricing Inputs (Genovia)")
-    st.caption(
-        "Genovia tier pricing loads from tiers.csv. Adjust below for scenario modeling. "
-        "Changes affect only this session."
-    )
-
-    tiers_runtime = {k: v.copy() for k, v in TIERS_BASE.items()}
-    shipping_runtime = SHIPPING_BASE.copy()
-
-    for tier_name, tier in tiers_runtime.items():
-        with st.expander(f"{tier_name} — Genovia Pricing Settings", expanded=False):
-            tier["case_price"] = st.number_input(
-                f"{tier_name} · Case Price",
-                min_value=0.0,
-                step=10.0,
-                value=float(tier["case_price"]),
-                key=f"case_price_{tier_name}",
-            )
-            tier["cost_per_tx"] = st.number_input(
-                f"{tier_name} · Cost per Treatment (Genovia)",
-                min_value=0.0,
-                step=1.0,
-                value=float(tier["cost_per_tx"]),
-                key=f"cost_per_tx_{tier_name}",
-            )
-            tier["tx_per_case"] = st.number_input(
-                f"{tier_name} · Treatments per Case",
-                min_value=1,
-                step=1,
-                value=int(tier["tx_per_case"]),
-                key=f"tx_per_case_{tier_name}",
-            )
+    # Tiers start out shared with the cached config; only tiers edited below get their own dict
+    tiers_runtime = dict(CFG.tiers)
+    shipping_runtime = CFG.shipping
 
-    st.markdown("---")
     st.markdown("### Clinic Inputs")
 
     tier_choice = st.selectbox("Genovia tier offered", list(tiers_runtime.keys()))
-    tier_selected = tiers_runtime[tier_choice]
-
-    num_cases = st.number_input(
-        "Number of cases in this order",
-        min_value=int(tier_selected["default_min_cases"]),
-        max_value=int(tier_selected["default_max_cases"]),
-        value=int(tier_selected["default_min_cases"]),
-        step=1,
-    )
-
-    price_per_tx = st.number_input(
-        "Clinic price per treatment ($)",
-        value=float(tier_selected["default_clinic_price_per_tx"]),
-        min_value=0.0,
-        step=50.0,
-    )
+    tier_defaults = CFG.tiers[tier_choice]
+    shipping_name = st.selectbox("Shipping option", list(shipping_runtime.keys()))
 
-    extra_cost_per_tx = st.number_input(
-        "Other per-treatment cost (tips, etc.)",
-        value=float(tier_selected["default_extra_cost_per_tx"]),
-        min_value=0.0,
-        step=10.0,
-    )
+    # All numeric inputs are batched in one form so typing does not rerun the whole app per keystroke
+    with st.form("roi_inputs"):
+        st.caption("Changes below apply when you click Recalculate.")
+
+        num_cases = st.number_input(
+            "Number of cases in this order",
+            min_value=int(tier_defaults["default_min_cases"]),
+            max_value=int(tier_defaults["default_max_cases"]),
+            value=int(tier_defaults["default_min_cases"]),
+            step=1,
+        )
+
+        price_per_tx = st.number_input(
+            "Clinic price per treatment ($)",
+            value=float(tier_defaults["default_clinic_price_per_tx"]),
+            min_value=0.0,
+            step=50.0,
+        )
+
+        extra_cost_per_tx = st.number_input(
+            "Other per-treatment cost (tips, etc.)",
+            value=float(tier_defaults["default_extra_cost_per_tx"]),
+            min_value=0.0,
+            step=10.0,
+        )
+
+        shipping_cost = st.number_input(
+            "Shipping cost for this order",
+            min_value=0.0,
+            step=5.0,
+            value=float(shipping_runtime[shipping_name]),
+            key="shipping_cost_active",
+        )
+
+        st.markdown("---")
+        st.markdown("### Tier Settings & Pricing Inputs (Genovia)")
+        st.caption(
+            "Genovia tier pricing loads from tiers.csv. Adjust below for scenario modeling. "
+            "Changes affect only this session."
+        )
+
+        for tier_name, tier in CFG.tiers.items():
+            with st.expander(f"{tier_name} — Genovia Pricing Settings", expanded=False):
+                case_price = st.number_input(
+                    f"{tier_name} · Case Price",
+                    min_value=0.0,
+                    step=10.0,
+                    value=float(tier["case_price"]),
+                    key=f"case_price_{tier_name}",
+                )
+                cost_per_tx = st.number_input(
+                    f"{tier_name} · Cost per Treatment (Genovia)",
+                    min_value=0.0,
+                    step=1.0,
+                    value=float(tier["cost_per_tx"]),
+                    key=f"cost_per_tx_{tier_name}",
+                )
+                tx_per_case = st.number_input(
+                    f"{tier_name} · Treatments per Case",
+                    min_value=1,
+                    step=1,
+                    value=int(tier["tx_per_case"]),
+                    key=f"tx_per_case_{tier_name}",
+                )
+
+            if (case_price, cost_per_tx, tx_per_case) != (tier["case_price"], tier["cost_per_tx"], tier["tx_per_case"]):
+                tiers_runtime[tier_name] = {
+                    **tier,
+                    "case_price": case_price,
+                    "cost_per_tx": cost_per_tx,
+                    "tx_per_case": tx_per_case,
+                }
+
+        st.form_submit_button("Recalculate")
 
-    st.markdown("### Shipping Assumptions")
-    shipping_name = st.selectbox("Shipping option", list(shipping_runtime.keys()))
-    shipping_cost = st.number_input(
-        "Shipping cost for this order",
-        min_value=0.0,
-        step=5.0,
-        value=float(shipping_runtime[shipping_name]),
-        key="shipping_cost_active",
-    )
+    tier_selected = tiers_runtime[tier_choice]
 
     st.markdown("---")
     st.markdown("### PDLLA Tier for Comparison")
-    pdlla_tier_choice = st.selectbox("PDLLA tier", list(PDLLA_TIERS_BASE.keys()))
-    pdlla_tier_selected = PDLLA_TIERS_BASE[pdlla_tier_choice]
+    pdlla_tier_choice = st.selectbox("PDLLA tier", list(CFG.pdlla_tiers.keys()))
+    pdlla_tier_selected = CFG.pdlla_tiers[pdlla_tier_choice]
 
 
 genovia_results = calc_roi(
-    tier=tier_selected,
+    case_price=tier_selected["case_price"],
+    cost_per_tx=tier_selected["cost_per_tx"],
+    tx_per_case=tier_selected["tx_per_case"],
     num_cases=int(num_cases),
     price_per_tx=price_per_tx,
     extra_cost_per_tx=extra_cost_per_tx,
@@ -415,7 +541,9 @@ genovia_results = calc_roi(
 )
 
 pdlla_results = calc_roi(
-    tier=pdlla_tier_selected,
+    case_price=pdlla_tier_selected["case_price"],
+    cost_per_tx=pdlla_tier_selected["cost_per_tx"],
+    tx_per_case=pdlla_tier_selected["tx_per_case"],
     num_cases=int(num_cases),
     price_per_tx=price_per_tx,
     extra_cost_per_tx=extra_cost_per_tx,
@@ -429,69 +557,65 @@ left, right = st.columns(2)
 with left:
     st.markdown(f"#### Genovia – {tier_choice} Tier")
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Revenue", fc(genovia_results["total_revenue"]))
-    col2.metric("Total Cost", fc(genovia_results["total_cost"]))
-    col3.metric("Total Profit", fc(genovia_results["total_profit"]))
+    col1.metric("Total Revenue", fc(genovia_results.total_revenue))
+    col2.metric("Total Cost", fc(genovia_results.total_cost))
+    col3.metric("Total Profit", fc(genovia_results.total_profit))
 
     col4, col5 = st.columns(2)
-    col4.metric("Margin", f"{genovia_results['margin_pct']:.1f}%")
-    col5.metric("ROI", f"{genovia_results['roi_pct']:.1f}%")
+    col4.metric("Margin", f"{genovia_results.margin_pct:.1f}%")
+    col5.metric("ROI", f"{genovia_results.roi_pct:.1f}%")
 
 with right:
     st.markdown(f"#### PDLLA – {pdlla_tier_choice} Tier")
     c1, c2, c3 = st.columns(3)
-    c1.metric("Total Revenue", fc(pdlla_results["total_revenue"]))
-    c2.metric("Total Cost", fc(pdlla_results["total_cost"]))
-    c3.metric("Total Profit", fc(pdlla_results["total_profit"]))
+    c1.metric("Total Revenue", fc(pdlla_results.total_revenue))
+    c2.metric("Total Cost", fc(pdlla_results.total_cost))
+    c3.metric("Total Profit", fc(pdlla_results.total_profit))
 
     c4, c5 = st.columns(2)
-    c4.metric("Margin", f"{pdlla_results['margin_pct']:.1f}%")
-    c5.metric("ROI", f"{pdlla_results['roi_pct']:.1f}%")
+    c4.metric("Margin", f"{pdlla_results.margin_pct:.1f}%")
+    c5.metric("ROI", f"{pdlla_results.roi_pct:.1f}%")
 
 summary_df = pd.DataFrame(
     {
-        "Metric": ["Total Revenue", "Total Cost", "Total Profit"],
         "Genovia": [
-            genovia_results["total_revenue"],
-            genovia_results["total_cost"],
-            genovia_results["total_profit"],
+            genovia_results.total_revenue,
+            genovia_results.total_cost,
+            genovia_results.total_profit,
         ],
         "PDLLA": [
-            pdlla_results["total_revenue"],
-            pdlla_results["total_cost"],
-            pdlla_results["total_profit"],
+            pdlla_results.total_revenue,
+            pdlla_results.total_cost,
+            pdlla_results.total_profit,
         ],
-    }
-).set_index("Metric")
+    },
+    index=pd.Index(["Total Revenue", "Total Cost", "Total Profit"], name="Metric"),
+)
 st.bar_chart(summary_df)
 
-scenario_export_df = pd.DataFrame(
-    [
-        {
-            "Genovia tier": tier_choice,
-            "PDLLA tier": pdlla_tier_choice,
-            "Number of cases": int(num_cases),
-            "Clinic price per treatment": float(price_per_tx),
-            "Other cost per treatment": float(extra_cost_per_tx),
-            "Shipping option": shipping_name,
-            "Shipping cost": float(shipping_cost),
-            "Genovia total revenue": genovia_results["total_revenue"],
-            "Genovia total cost": genovia_results["total_cost"],
-            "Genovia total profit": genovia_results["total_profit"],
-            "Genovia margin %": genovia_results["margin_pct"],
-            "Genovia ROI %": genovia_results["roi_pct"],
-            "PDLLA total revenue": pdlla_results["total_revenue"],
-            "PDLLA total cost": pdlla_results["total_cost"],
-            "PDLLA total profit": pdlla_results["total_profit"],
-            "PDLLA margin %": pdlla_results["margin_pct"],
-            "PDLLA ROI %": pdlla_results["roi_pct"],
-        }
-    ]
-)
+scenario_export_row = {
+    "Genovia tier": tier_choice,
+    "PDLLA tier": pdlla_tier_choice,
+    "Number of cases": int(num_cases),
+    "Clinic price per treatment": float(price_per_tx),
+    "Other cost per treatment": float(extra_cost_per_tx),
+    "Shipping option": shipping_name,
+    "Shipping cost": float(shipping_cost),
+    "Genovia total revenue": genovia_results.total_revenue,
+    "Genovia total cost": genovia_results.total_cost,
+    "Genovia total profit": genovia_results.total_profit,
+    "Genovia margin %": genovia_results.margin_pct,
+    "Genovia ROI %": genovia_results.roi_pct,
+    "PDLLA total revenue": pdlla_results.total_revenue,
+    "PDLLA total cost": pdlla_results.total_cost,
+    "PDLLA total profit": pdlla_results.total_profit,
+    "PDLLA margin %": pdlla_results.margin_pct,
+    "PDLLA ROI %": pdlla_results.roi_pct,
+}
 
 st.download_button(
     label="⬇️ Download current scenario (CSV)",
-    data=scenario_export_df.to_csv(index=False),
+    data=_scenario_csv_bytes(tuple(scenario_export_row.items())),
     file_name="genovia_pdlla_roi_scenario.csv",
     mime="text/csv",
 )
@@ -499,32 +623,41 @@ st.download_button(
 st.markdown("---")
 st.subheader("Genovia – Compare Tiers at Same Clinic Price")
 
-comparison = []
-for tname, info in tiers_runtime.items():
-    r = calc_roi(
-        tier=info,
-        num_cases=int(num_cases),
-        price_per_tx=price_per_tx,
-        extra_cost_per_tx=extra_cost_per_tx,
-        shipping_cost=shipping_cost,
-    )
-    comparison.append(
-        {
-            "Tier": tname,
-            "Cost per treatment": r["cost_per_tx_product"],
-            "Total Profit": r["total_profit"],
-            "ROI %": r["roi_pct"],
-        }
-    )
+comp_case_price = np.array([t["case_price"] for t in tiers_runtime.values()], dtype=np.float64)
+comp_cost_per_tx = np.array([t["cost_per_tx"] for t in tiers_runtime.values()], dtype=np.float64)
+comp_tx_per_case = np.array([t["tx_per_case"] for t in tiers_runtime.values()], dtype=np.int64)
+
+comp = _roi_core(
+    case_price=comp_case_price,
+    cost_per_tx=comp_cost_per_tx,
+    tx_per_case=comp_tx_per_case,
+    num_cases=int(num_cases),
+    price_per_tx=float(price_per_tx),
+    extra_cost_per_tx=float(extra_cost_per_tx),
+    shipping_cost=float(shipping_cost),
+)
+comp_roi_pct = (
+    np.divide(comp.total_profit, comp.total_cost, out=np.zeros_like(comp.total_cost), where=comp.total_cost != 0)
+    * 100
+)
+
+genovia_comp_df = pd.DataFrame(
+    {
+        "Tier": CFG.tier_names,
+        "Cost per treatment": comp_cost_per_tx,
+        "Total Profit": comp.total_profit,
+        "ROI %": comp_roi_pct,
+    }
+)
+st.table(genovia_comp_df.style.format({"Cost per treatment": fc1, "Total Profit": fc, "ROI %": "{:.1f}%"}))
 
-genovia_comp_df = pd.DataFrame(comparison)
-st.table(genovia_comp_df)
+comp_by_tier = genovia_comp_df.set_index("Tier")
 
 st.markdown("#### Genovia – Profit by Tier")
-st.bar_chart(genovia_comp_df.set_index("Tier")["Total Profit"])
+st.bar_chart(comp_by_tier["Total Profit"])
 
 st.markdown("#### Genovia – ROI by Tier")
-st.bar_chart(genovia_comp_df.set_index("Tier")["ROI %"])
+st.bar_chart(comp_by_tier["ROI %"])
 
 st.download_button(
     label="⬇️ Download Genovia tier comparison (CSV)",
@@ -533,7 +666,23 @@ st.download_button(
     mime="text/csv",
 )
 
-report_buffer = build_word_report(
+# Reruns triggered by the report buttons only re-execute this fragment, not the whole app
+@st.fragment
+def report_section(**report_inputs):
+    # The report is only built on request; python-docx is imported lazily inside build_word_report
+    if st.button("📝 Prepare Word report (Genovia vs PDLLA)"):
+        report_bytes = build_word_report(**report_inputs)
+
+        st.download_button(
+            label="⬇️ Download Word report (Genovia vs PDLLA)",
+            data=report_bytes,
+            file_name="Genovia_vs_PDLLA_ROI_Report.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        )
+
+
+st.markdown("---")
+report_section(
     genovia_tier_name=tier_choice,
     genovia_results=genovia_results,
     pdlla_tier_name=pdlla_tier_choice,
@@ -545,12 +694,3 @@ report_buffer = build_word_report(
     shipping_cost=shipping_cost,
     genovia_comp_df=genovia_comp_df,
 )
-
-st.markdown("---")
-st.download_button(
-    label="⬇️ Download Word report (Genovia vs PDLLA)",
-    data=report_buffer,
-    file_name="Genovia_vs_PDLLA_ROI_Report.docx",
-    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-)
-